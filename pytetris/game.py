@@ -27,23 +27,39 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import islice
 from typing import Optional
 
 import pygame
 
 from .locals.color import BLACK, COLORS, GREY, WHITE
-from .locals.game import BLOCKS, FONT, KEY_REPEATS, KEY_TO_MOVE, PREVIEW_NUM, BlockType
+from .locals.game import (
+    BLOCKS,
+    FONT,
+    FPS,
+    KEY_REPEATS,
+    KEY_TO_MOVE,
+    PREVIEW_CACHE_SIZE,
+    PREVIEW_NUM,
+    BlockType,
+)
 from .locals.size import (
     DISPLAY_SIZE,
     GRID_BOX_SIZE,
     GRID_POS,
+    HOLD_POS,
     LINE_WIDTH,
     PADDING,
-    PLAYFIELD_SIZE,
+    PREVIEW_POS,
     SQUARE_WIDTH,
+    STATS_POS,
     TEXT_AREA,
     VISIBLE_PLAYFIELD_SIZE,
     VISIBLE_ROWS,
+    Position,
 )
 from .locals.types import Color
 from .state import TetrisState
@@ -56,49 +72,81 @@ class Tetris:
     Represents a game of Tetris
     """
 
+    def __init__(self):
+        self._preview_cache = OrderedDict()
+        self._drawn = {}  # What each region of the display currently shows
+        self._dirty_rects = []  # Regions of the display to be updated
+
     @staticmethod
-    def _draw_grid_square(
-        surface: pygame.Surface, color: Optional[Color], x: int, y: int
+    def _draw_filled_square(
+        surface: pygame.Surface, color: Color, x: int, y: int, origin: Position,
     ):
-        x *= SQUARE_WIDTH
-        y *= SQUARE_WIDTH
-        if color is not None:
-            if all(v <= 0 for v in color):
-                color = tuple(-v // 2 for v in color)
-            pygame.draw.rect(
-                surface, color, (x, y, SQUARE_WIDTH, SQUARE_WIDTH),
-            )
-            pygame.draw.rect(
-                surface, color, (x, y, SQUARE_WIDTH, SQUARE_WIDTH),
-            )
+        x = origin.x + x * SQUARE_WIDTH
+        y = origin.y + y * SQUARE_WIDTH
+        pygame.draw.rect(
+            surface, color, (x, y, SQUARE_WIDTH, SQUARE_WIDTH),
+        )
         pygame.draw.rect(
             surface, GREY, (x, y, SQUARE_WIDTH, SQUARE_WIDTH), LINE_WIDTH,
         )
 
+    @staticmethod
+    def _draw_empty_lattice(surface: pygame.Surface, width: int, height: int):
+        # Draws the outlines of a grid of empty squares as a single polyline.
+        # Each square has its own outline, so there are two lines between squares
+        right = width * SQUARE_WIDTH - 1
+        bottom = height * SQUARE_WIDTH - 1
+        xs = sorted(
+            {x * SQUARE_WIDTH for x in range(width)}
+            | {x * SQUARE_WIDTH - 1 for x in range(1, width + 1)}
+        )
+        ys = sorted(
+            {y * SQUARE_WIDTH for y in range(height)}
+            | {y * SQUARE_WIDTH - 1 for y in range(1, height + 1)}
+        )
+        # Alternates the direction of each line, so that the path joining them
+        # runs along the edges of the grid, which are lines themselves
+        points = []
+        for i, x in enumerate(xs):
+            points += [(x, 0), (x, bottom)] if i % 2 == 0 else [(x, bottom), (x, 0)]
+        for i, y in enumerate(ys):
+            points += [(right, y), (0, y)] if i % 2 == 0 else [(0, y), (right, y)]
+        pygame.draw.lines(surface, GREY, False, points, LINE_WIDTH)
+
     def _draw_grid(self):
-        # Draws the grid and the squares on the board
-        grid_surface = pygame.Surface(VISIBLE_PLAYFIELD_SIZE.in_pixels)
+        # Draws the grid and the squares on the board straight onto the display,
+        # clipped to the playfield
+        grid_rect = pygame.Rect(GRID_POS, VISIBLE_PLAYFIELD_SIZE.in_pixels)
+        self.display.set_clip(grid_rect)
+        self.display.blit(self._empty_grid_surface, GRID_POS)
         for y, row in enumerate(self.state.grid[-VISIBLE_ROWS:]):
             for x, color in enumerate(row):
-                self._draw_grid_square(grid_surface, color, x, y)
+                if color is not None:
+                    self._draw_filled_square(self.display, color, x, y, GRID_POS)
+        self.display.set_clip(None)
+        self._dirty_rects.append(grid_rect)
 
-        self.display.blit(grid_surface, GRID_POS)
+    @classmethod
+    def _draw_empty_grid(cls):
+        # Draws the lines of the empty playfield, which are the same every frame
+        surface = pygame.Surface(VISIBLE_PLAYFIELD_SIZE.in_pixels)
+        cls._draw_empty_lattice(surface, *VISIBLE_PLAYFIELD_SIZE.in_squares)
+        return surface
 
     @classmethod
+    @lru_cache(maxsize=len(BlockType) + 1)
     def _draw_grid_box(cls, block_type: Optional[BlockType] = None):
+        # Boxes only depend on the block type, so each one is drawn only once
         surface = pygame.Surface(GRID_BOX_SIZE.in_pixels)
-        for y in range(GRID_BOX_SIZE.height):
-            for x in range(GRID_BOX_SIZE.width):
-                color = None
-                if block_type is not None:
-                    block = BLOCKS[block_type]
-                    if (
-                        0 <= y - 1 < len(block)
-                        and 0 <= x - 1 < len(block[y - 1])
-                        and block[y - 1][x - 1] == "."
-                    ):
-                        color = COLORS[block_type]
-                cls._draw_grid_square(surface, color, x, y)
+        cls._draw_empty_lattice(surface, *GRID_BOX_SIZE.in_squares)
+        if block_type is not None:
+            # The block is drawn one square in from the top left of the box
+            for y, row in enumerate(BLOCKS[block_type]):
+                for x, square in enumerate(row):
+                    if square == ".":
+                        cls._draw_filled_square(
+                            surface, COLORS[block_type], x + 1, y + 1, Position(0, 0)
+                        )
         return surface
 
     @staticmethod
@@ -113,43 +161,65 @@ class Tetris:
         label_surface.blit(label, (label_x, label_y))
         return label_surface
 
+    def _needs_drawing(self, region: str, contents) -> bool:
+        # Records what a region of the display is to show,
+        # returning whether that differs from what it shows already
+        if region in self._drawn and self._drawn[region] == contents:
+            return False
+        self._drawn[region] = contents
+        return True
+
     def _draw_hold(self):
         # Draw the hold grid
-        hold_x = (PADDING.pwidth - GRID_BOX_SIZE.pwidth) // 2
-        hold_y = PADDING.pheight
+        if not self._needs_drawing("hold", self.state.hold_block_type):
+            return
         hold_surface = self._draw_grid_box(self.state.hold_block_type)
-        self.display.blit(hold_surface, (hold_x, hold_y))
-
-        # Draw the hold label
-        hold_label_surface = self._draw_grid_box_label("Hold Box")
-        self.display.blit(hold_label_surface, (hold_x, 0))
+        self.display.blit(hold_surface, HOLD_POS)
+        self._dirty_rects.append(pygame.Rect(HOLD_POS, GRID_BOX_SIZE.in_pixels))
 
     def _draw_next_pieces(self):
         # Draw the grids
-        preview_x = (
-            PLAYFIELD_SIZE.pwidth
-            + PADDING.pwidth
-            + (PADDING.pwidth - GRID_BOX_SIZE.pwidth) // 2
-        )
-        preview_y = PADDING.pheight
-        preview_surface = pygame.Surface(
-            (GRID_BOX_SIZE.pwidth, GRID_BOX_SIZE.pheight * PREVIEW_NUM)
+        next_pieces = tuple(islice(self.state.next_tetrominoes, PREVIEW_NUM))
+        if not self._needs_drawing("next_pieces", next_pieces):
+            return
+        # The column of previews only changes when a new block is taken
+        # from the queue, so composed columns are cached by their pieces
+        preview_surface = self._preview_cache.get(next_pieces)
+        if preview_surface is None:
+            preview_surface = pygame.Surface(
+                (GRID_BOX_SIZE.pwidth, GRID_BOX_SIZE.pheight * PREVIEW_NUM)
+            )
+            for y, block_type in enumerate(next_pieces):
+                box_surface = self._draw_grid_box(block_type)
+                preview_surface.blit(box_surface, (0, GRID_BOX_SIZE.pheight * y))
+            self._preview_cache[next_pieces] = preview_surface
+            if len(self._preview_cache) > PREVIEW_CACHE_SIZE:
+                self._preview_cache.popitem(last=False)
+        else:
+            self._preview_cache.move_to_end(next_pieces)
+        self.display.blit(preview_surface, PREVIEW_POS)
+        self._dirty_rects.append(
+            pygame.Rect(PREVIEW_POS, preview_surface.get_size())
         )
-        for y in range(PREVIEW_NUM):
-            box_surface = self._draw_grid_box(self.state.next_tetrominoes[y])
-            preview_surface.blit(box_surface, (0, GRID_BOX_SIZE.pheight * y))
-        self.display.blit(preview_surface, (preview_x, preview_y))
-
-        # Draw label
-        preview_label_surface = self._draw_grid_box_label("Next Pieces")
-        self.display.blit(preview_label_surface, (preview_x, 0))
 
     def _draw_stats(self):
+        # The text is only rendered again when the level or score changes
+        stats = (self.state.level, self.state.score)
+        if not self._needs_drawing("stats", stats):
+            return
+        stats_rect = pygame.Rect(STATS_POS, TEXT_AREA.in_pixels)
+        # The text is drawn over a transparent background, so the old text is cleared
+        self.display.fill(WHITE, stats_rect)
+        self.display.blit(self._draw_stats_text(*stats), STATS_POS)
+        self._dirty_rects.append(stats_rect)
+
+    @staticmethod
+    def _draw_stats_text(level: int, score: int):
         # Creates a text surface to blit to
         text_surface = pygame.Surface(TEXT_AREA.in_pixels, pygame.SRCALPHA)
 
         # Label for the stats
-        texts = (f"Level: {self.state.level}", f"Score: {self.state.score}")
+        texts = (f"Level: {level}", f"Score: {score}")
 
         # Width of each "cell"
         width = text_surface.get_width() // len(texts)
@@ -161,44 +231,75 @@ class Tetris:
             y = (height - text.get_height()) // 2
             text_surface.blit(text, (x, y))
 
-        self.display.blit(
-            text_surface, (GRID_POS.x, GRID_POS.y + VISIBLE_PLAYFIELD_SIZE.pheight)
-        )
+        return text_surface
+
+    @staticmethod
+    def _wait_until(deadline: int):
+        # Sleeps until shortly before the deadline, in nanoseconds,
+        # then yields until it is reached, for steadier frame pacing
+        remaining = deadline - time.monotonic_ns() - 1_000_000
+        if remaining > 0:
+            time.sleep(remaining / 1_000_000_000)
+        while time.monotonic_ns() < deadline:
+            time.sleep(0)
+
+    def _handle_keydown(self, key: int):
+        # Applies the action bound to a key press
+        if self.state.block is None:
+            return
+        if key in KEY_TO_MOVE:
+            self.state._do_move(KEY_TO_MOVE[key])
+        if key in KEY_REPEATS:
+            self.repeating_keys.add(key)
+        elif key == pygame.K_c:
+            self.state._hold_block()
 
     def _run_game(self):
         # Returns whether to the game is still to run
 
         self.state = TetrisState()
-        self.clock = pygame.time.Clock()
+        self._reset_display()
+        # Times in nanoseconds
+        frame_time = 1_000_000_000 // FPS
+        frame_start = time.monotonic_ns()
+        unused_time = 0  # Time elapsed that is yet to be passed to the state
         self.repeating_keys = set()
         self.key_repeats_timers = {k: 0 for k in KEY_REPEATS}
 
+        # Local bindings for names looked up for every event
+        QUIT, KEYUP, KEYDOWN = pygame.QUIT, pygame.KEYUP, pygame.KEYDOWN
+        VIDEOEXPOSE = pygame.VIDEOEXPOSE
+        K_ESCAPE = pygame.K_ESCAPE
+        event_get = pygame.event.get
+
         while not self.state.game_over:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    return False
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            # Each type of event is fetched separately. Key presses are handled
+            # before releases, so that a tap within one frame does not keep repeating
+            if event_get(QUIT):
+                return False
+            for event in event_get(KEYDOWN):
+                if event.key == K_ESCAPE:
                     self.state.paused = not self.state.paused
-                if self.state.paused:
-                    break
-                if event.type == pygame.KEYUP:
-                    if event.key in self.repeating_keys:
-                        self.repeating_keys.remove(event.key)
-                        self.key_repeats_timers[event.key] = 0
-                elif self.state.block is None:
-                    continue
-                if event.type == pygame.KEYDOWN:
-                    if event.key in KEY_TO_MOVE:
-                        self.state._do_move(KEY_TO_MOVE[event.key])
-                    if event.key in KEY_REPEATS and not getattr(event, "repeat", False):
-                        self.repeating_keys.add(event.key)
-                    elif event.key == pygame.K_c:
-                        self.state._hold_block()
-
+                elif not self.state.paused:
+                    self._handle_keydown(event.key)
+            for event in event_get(KEYUP):
+                if event.key in self.repeating_keys:
+                    self.repeating_keys.remove(event.key)
+                    self.key_repeats_timers[event.key] = 0
+            if event_get(VIDEOEXPOSE):
+                # Only changed regions are updated, so the window is drawn afresh
+                self._reset_display()
+                self.state.dirty = True
+
+            # Caps the frame rate, so that the game does not spin while idle
+            self._wait_until(frame_start + frame_time)
+            now = time.monotonic_ns()
+            unused_time += now - frame_start
+            frame_start = now
+            millis, unused_time = divmod(unused_time, 1_000_000)
             if self.state.paused:
                 continue
 
-            millis = self.clock.tick()
             self.state._update_time(millis)
 
             if self.state.game_over:
@@ -207,14 +308,22 @@ class Tetris:
             for key in self.repeating_keys:
                 self.key_repeats_timers[key] += millis
                 delay, interval = KEY_REPEATS[key]
-                while self.key_repeats_timers[key] - delay > interval:
-                    pygame.event.post(
-                        pygame.event.Event(pygame.KEYDOWN, key=key, repeat=True)
-                    )
-                    self.key_repeats_timers[key] -= interval
-
-            self.render()
-            pygame.display.update()
+                excess = self.key_repeats_timers[key] - delay
+                if excess > interval:
+                    # Number of whole intervals that leave the timer above the delay
+                    repeats = (excess - 1) // interval
+                    self.key_repeats_timers[key] -= repeats * interval
+                    movement = KEY_TO_MOVE[key]
+                    for _ in range(repeats):
+                        if self.state.block is None:
+                            break
+                        self.state._do_move(movement)
+
+            if self.state.dirty:
+                self.render()
+                pygame.display.update(self._dirty_rects)
+                self._dirty_rects.clear()
+                self.state.dirty = False
         return True
 
     def _game_over(self):
@@ -226,8 +335,17 @@ class Tetris:
                     return True
         return False
 
-    def render(self):
+    def _reset_display(self):
+        # Clears the display and draws the labels, which never change,
+        # so that every other region is drawn again by the next render
         self.display.fill(WHITE)
+        self.display.blit(self._hold_label_surface, (HOLD_POS.x, 0))
+        self.display.blit(self._preview_label_surface, (PREVIEW_POS.x, 0))
+        self._drawn.clear()
+        self._dirty_rects.append(self.display.get_rect())
+
+    def render(self):
+        # Draws the regions of the display that have changed since last drawn
         self._draw_grid()
         self._draw_stats()
         self._draw_hold()
@@ -236,6 +354,14 @@ class Tetris:
     def run(self):
         self.display = pygame.display.set_mode(DISPLAY_SIZE.in_pixels)
         pygame.display.set_caption("PyTetris")
+        # Events that the game does not handle are kept out of the queue
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(
+            [pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.VIDEOEXPOSE]
+        )
+        self._empty_grid_surface = self._draw_empty_grid()
+        self._hold_label_surface = self._draw_grid_box_label("Hold Box")
+        self._preview_label_surface = self._draw_grid_box_label("Next Pieces")
 
         while True:
             run = self._run_game()
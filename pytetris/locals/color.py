@@ -40,6 +40,11 @@ COLORS = {
     BlockType.ZBlock: (255, 0, 0),
 }
 
+# Ghost pieces are drawn at half the brightness of their tetromino
+GHOST_COLORS = {
+    block_type: tuple(v // 2 for v in color) for block_type, color in COLORS.items()
+}
+
 # Color tuples
 WHITE = 3 * (255,)
 BLACK = 3 * (0,)
@@ -31,6 +31,8 @@ from enum import Enum
 
 import pygame
 
+from .size import COLUMNS
+
 
 class BlockType(Enum):
     """
@@ -56,6 +58,9 @@ class Movement(Enum):
     ROT_AC = 6
 
 
+# All the block types, for drawing each bag of tetrominoes from
+BLOCK_TYPES = tuple(BlockType)
+
 # The length of time before a shape locks
 LOCK_DELAY = 500
 
@@ -65,14 +70,15 @@ NEW_BLOCK_DELAY = 200
 # The number of lines to clear per level
 LINE_GOAL_MULTIPLIER = 5
 
+# Milliseconds between each fall of a block for each level, from level 1.
+# Falls are already far faster than a frame by the last level, which is used
+# for every level beyond it.
+FALL_INTERVALS = tuple(
+    1000 * (0.8 - 0.007 * (level - 1)) ** (level - 1) for level in range(1, 31)
+)
+
 # Adjusted line count for levels
-ADJUSTED_LINE_COUNT = {
-    0: 0,
-    1: 1,
-    2: 3,
-    3: 5,
-    4: 8,
-}
+ADJUSTED_LINE_COUNT = (0, 1, 3, 5, 8)  # Indexed by the number of lines cleared
 
 # Tuple format (lines, Full T-Spin bool or None)
 SCORING_MULTIPLIER = {
@@ -100,9 +106,15 @@ DIFFICULT_LINE_CLEARS = [
 ]
 
 
+# Maximum number of frames drawn per second
+FPS = 60
+
 # Number of preview pieces
 PREVIEW_NUM = 3
 
+# Number of rendered preview columns kept for reuse
+PREVIEW_CACHE_SIZE = 64
+
 # Text font
 pygame.font.init()
 FONT = pygame.font.SysFont("Arial", 20)
@@ -159,12 +171,20 @@ I_WALL_KICKS = {
 WALL_KICKS = {
     BlockType.JBlock: JLSTZ_WALL_KICKS,
     BlockType.LBlock: JLSTZ_WALL_KICKS,
-    BlockType.JBlock: JLSTZ_WALL_KICKS,
+    BlockType.SBlock: JLSTZ_WALL_KICKS,
     BlockType.TBlock: JLSTZ_WALL_KICKS,
     BlockType.ZBlock: JLSTZ_WALL_KICKS,
     BlockType.IBlock: I_WALL_KICKS,
 }
 
+# Wall kicks indexed by block type value * 16 + old rotation * 4 + new rotation
+WALL_KICKS_FLAT = tuple(
+    tuple(WALL_KICKS.get(block_type, {}).get(old_rotation, {}).get(new_rotation, ()))
+    for block_type in BlockType
+    for old_rotation in range(4)
+    for new_rotation in range(4)
+)
+
 # Tetromino definitions
 # fmt: off
 BLOCKS = {
@@ -193,26 +213,105 @@ BLOCKS = {
 }
 # fmt: on
 
-# T-Block pointing side corner blocks for T-Spins
-T_BLOCK_POINTING_CORNERS = {
-    0: [(0, 0), (2, 0)],
-    1: [(2, 0), (2, 2)],
-    2: [(2, 2), (0, 2)],
-    3: [(0, 2), (0, 0)],
+
+def _rotate_block(block):
+    # Rotates a tetromino definition 90 degrees clockwise
+    return [
+        "".join(block[y][x] for y in range(len(block) - 1, -1, -1))
+        for x in range(len(block[0]))
+    ]
+
+
+def _block_rotations(block):
+    # Returns the four rotations of a tetromino definition, starting from the spawn
+    rotations = [block]
+    for _ in range(3):
+        rotations.append(_rotate_block(rotations[-1]))
+    return rotations
+
+
+def _row_masks(block):
+    # Bitmask for each row of a tetromino, where bit x is set if column x is filled
+    return tuple(
+        sum(1 << x for x, square in enumerate(row) if square == ".") for row in block
+    )
+
+
+def _extents(cells):
+    # Leftmost, rightmost, top and bottom of a tetromino's filled squares
+    xs, ys = zip(*cells)
+    return min(xs), max(xs), min(ys), max(ys)
+
+
+# Each rotation of each tetromino, indexed by the number of clockwise turns
+ROTATED_BLOCKS = {
+    block_type: tuple(tuple(rotation) for rotation in _block_rotations(block))
+    for block_type, block in BLOCKS.items()
 }
 
-# Block behind the center piece on T-Block
-T_BLOCK_BEHIND_BLOCK = {
-    0: (1, 2),
-    1: (0, 1),
-    2: (1, 0),
-    3: (2, 1),
+# Positions of the filled squares for each rotation of each tetromino
+CELL_OFFSETS = {
+    block_type: tuple(
+        tuple(
+            (x, y)
+            for y, row in enumerate(rotation)
+            for x, square in enumerate(row)
+            if square == "."
+        )
+        for rotation in rotations
+    )
+    for block_type, rotations in ROTATED_BLOCKS.items()
 }
 
+# Row bitmasks for each rotation of each tetromino
+SHAPE_MASKS = {
+    block_type: tuple(_row_masks(rotation) for rotation in rotations)
+    for block_type, rotations in ROTATED_BLOCKS.items()
+}
+
+# Extents of the filled squares for each rotation of each tetromino
+SHAPE_EXTENTS = {
+    block_type: tuple(_extents(cells) for cells in rotations)
+    for block_type, rotations in CELL_OFFSETS.items()
+}
+
+# Bitmask of a row where every square is filled
+FULL_ROW_MASK = (1 << COLUMNS) - 1
+
+# Corners of the T-Block's bounding box checked for T-Spins
+T_BLOCK_CORNERS = ((0, 0), (0, 2), (2, 0), (2, 2))
+
+# T-Block pointing side corner blocks for T-Spins, indexed by rotation
+T_BLOCK_POINTING_CORNERS = (
+    ((0, 0), (2, 0)),
+    ((2, 0), (2, 2)),
+    ((2, 2), (0, 2)),
+    ((0, 2), (0, 0)),
+)
+
+# The pointing side corners as bitmasks, where bit i stands for T_BLOCK_CORNERS[i]
+T_BLOCK_POINTING_MASKS = tuple(
+    sum(1 << T_BLOCK_CORNERS.index(corner) for corner in corners)
+    for corners in T_BLOCK_POINTING_CORNERS
+)
+
+# Block behind the center piece on T-Block, indexed by rotation
+T_BLOCK_BEHIND_BLOCK = (
+    (1, 2),
+    (0, 1),
+    (1, 0),
+    (2, 1),
+)
+
 TST_WALL_KICKS = (1, 3)  # Wall kicks that determine if a TST has occurred
 TST_ROTATIONS = (3, 0, 1)  # For clockwise direction, reverse for anticlockwise
 
-ROTATION_MOVEMENTS = (Movement.ROT_AC, Movement.ROT_C)
+ROTATION_MOVEMENTS = frozenset((Movement.ROT_AC, Movement.ROT_C))
+
+# Movements that reset the lock timer
+LOCK_RESET_MOVEMENTS = frozenset(
+    (Movement.LEFT, Movement.RIGHT, Movement.ROT_AC, Movement.ROT_C)
+)
 
 KEY_TO_MOVE = {
     pygame.K_DOWN: Movement.SOFT_DROP,
@@ -67,7 +67,7 @@ class Dimensions(namedtuple("Dimensions", "width height pwidth pheight")):  # no
         :type: int
     """
 
-    def __new__(cls, *args, **kwargs):
+    def __new__(cls, width: int, height: int):
         """
         Creates a new dimension specification
 
@@ -79,9 +79,9 @@ class Dimensions(namedtuple("Dimensions", "width height pwidth pheight")):  # no
         >>> Dimensions(2, 4)
         Dimensions(width=2, height=4, pwidth=50, pheight=100)
         """
-        args = list(args) + [arg * SQUARE_WIDTH for arg in args]
-        kwargs.update({f"p{k}": v * SQUARE_WIDTH for k, v in kwargs.items()})
-        return super().__new__(cls, *args, **kwargs)
+        return super().__new__(
+            cls, width, height, width * SQUARE_WIDTH, height * SQUARE_WIDTH
+        )
 
     @property
     def in_pixels(self):
@@ -113,5 +113,12 @@ VISIBLE_PLAYFIELD_SIZE = Dimensions(COLUMNS, VISIBLE_ROWS)
 TEXT_AREA = Dimensions(COLUMNS, PADDING.height)
 # The position of the playfield relative to the display surface
 GRID_POS = Position(*PADDING.in_pixels)
+# The positions of the hold box and the next piece previews, centred in the padding
+HOLD_POS = Position((PADDING.pwidth - GRID_BOX_SIZE.pwidth) // 2, PADDING.pheight)
+PREVIEW_POS = Position(
+    PLAYFIELD_SIZE.pwidth + PADDING.pwidth + HOLD_POS.x, PADDING.pheight
+)
+# The position of the text area below the playfield
+STATS_POS = Position(GRID_POS.x, GRID_POS.y + VISIBLE_PLAYFIELD_SIZE.pheight)
 # The position that new tetrominoes appear
 SPAWN_POS = Position(3, 19)
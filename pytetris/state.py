@@ -28,24 +28,33 @@ SOFTWARE.
 """
 
 import random
+from collections import deque, namedtuple
 from typing import List, Optional, Tuple
 
-from .locals.color import COLORS
+from .locals.color import COLORS, GHOST_COLORS
 from .locals.game import (
     ADJUSTED_LINE_COUNT,
     B2B_MULTIPLIER,
-    BLOCKS,
+    BLOCK_TYPES,
+    CELL_OFFSETS,
     DIFFICULT_LINE_CLEARS,
+    FALL_INTERVALS,
+    FULL_ROW_MASK,
     LINE_GOAL_MULTIPLIER,
     LOCK_DELAY,
+    LOCK_RESET_MOVEMENTS,
     NEW_BLOCK_DELAY,
+    ROTATED_BLOCKS,
     ROTATION_MOVEMENTS,
     SCORING_MULTIPLIER,
+    SHAPE_EXTENTS,
+    SHAPE_MASKS,
     T_BLOCK_BEHIND_BLOCK,
-    T_BLOCK_POINTING_CORNERS,
+    T_BLOCK_CORNERS,
+    T_BLOCK_POINTING_MASKS,
     TST_ROTATIONS,
     TST_WALL_KICKS,
-    WALL_KICKS,
+    WALL_KICKS_FLAT,
     BlockType,
     Movement,
 )
@@ -53,11 +62,33 @@ from .locals.size import COLUMNS, ROWS, SPAWN_POS, VISIBLE_ROWS
 from .locals.types import Color
 
 
+def _shift_mask(mask: int, x: int) -> int:
+    # Shifts a row bitmask so that its first column lies at column x
+    return mask << x if x >= 0 else mask >> -x
+
+
 class TetrominoBase:
     """
     Base class for tetrominoes
     """
 
+    __slots__ = (
+        "x",
+        "y",
+        "block_type",
+        "_shapes",
+        "block",
+        "_cells",
+        "grid",
+        "row_masks",
+        "rotation",
+        "color",
+        "placed",
+        "_can_fall",
+    )
+
+    solid = True  # Whether the tetromino blocks the movement of others
+
     def __init__(
         self,
         x: int,
@@ -65,15 +96,20 @@ class TetrominoBase:
         block_type: BlockType,
         color: Color,
         grid: List[List[Color]],
+        row_masks: List[int],
     ):
         self.x = x
         self.y = y
         self.block_type = block_type
-        self.block = BLOCKS[block_type][:]
+        self._shapes = ROTATED_BLOCKS[block_type]  # The shape in each rotation
+        self.block = self._shapes[0]
+        self._cells = CELL_OFFSETS[block_type][0]  # Offsets of the filled squares
         self.grid = grid
+        self.row_masks = row_masks
         self.rotation = 0
         self.color = color
         self.placed = False
+        self._can_fall = None  # Cached result of can_move(0, 1), None if unknown
 
     def with_remove(method):  # noqa
         def inner(self, *args, **kwargs):
@@ -81,7 +117,7 @@ class TetrominoBase:
             self.remove()
             ret = method(self, *args, **kwargs)
             if was_placed:
-                self.place()
+                self.place(test_place=False)
             return ret
 
         return inner
@@ -108,15 +144,18 @@ class TetrominoBase:
             test_place = False
         if test_place and not self._can_place():
             return False
-        for y, row in enumerate(self.block):
-            for x, square in enumerate(row):
-                bx = self.x + x
-                by = self.y + y
-                if square == "." and 0 <= bx < COLUMNS and 0 <= by < ROWS:
-                    if self.grid[by][bx] is None or (
-                        self.grid[by][bx] is not None and not skip_non_empty
-                    ):
-                        self.grid[by][bx] = self.color
+        # Placements are always within the playing field, as checked by can_move
+        grid, sx, sy, color = self.grid, self.x, self.y, self.color
+        for x, y in self._cells:
+            row = grid[sy + y]
+            if not skip_non_empty or row[sx + x] is None:
+                row[sx + x] = color
+        if self.solid:
+            row_masks = self.row_masks
+            shape = SHAPE_MASKS[self.block_type][self.rotation]
+            _, _, top, bottom = SHAPE_EXTENTS[self.block_type][self.rotation]
+            for y in range(top, bottom + 1):
+                row_masks[sy + y] |= _shift_mask(shape[y], sx)
 
         self.placed = True
         return True if test_place else None
@@ -125,54 +164,66 @@ class TetrominoBase:
         # Removes this shape from the grid
         if not self.placed:
             return
-        for y, row in enumerate(self.block):
-            for x, square in enumerate(row):
-                if (
-                    square == "."
-                    and 0 <= self.x + x < COLUMNS
-                    and 0 <= self.y + y < ROWS
-                    and self.grid[self.y + y][self.x + x] == self.color
-                ):
-                    self.grid[self.y + y][self.x + x] = None
+        grid, sx, sy, color = self.grid, self.x, self.y, self.color
+        for x, y in self._cells:
+            row = grid[sy + y]
+            if row[sx + x] == color:
+                row[sx + x] = None
+        if self.solid:
+            row_masks = self.row_masks
+            shape = SHAPE_MASKS[self.block_type][self.rotation]
+            _, _, top, bottom = SHAPE_EXTENTS[self.block_type][self.rotation]
+            for y in range(top, bottom + 1):
+                row_masks[sy + y] &= ~_shift_mask(shape[y], sx)
         self.placed = False
 
-    @with_remove
     def can_move(self, dx: int, dy: int) -> bool:
         # Determines whether this shape can move in a given direction
-        can_move = False
-        for y, row in enumerate(self.block):
-            for x, square in enumerate(row):
-                if not square == ".":
-                    continue
-                new_x = self.x + x + dx
-                new_y = self.y + y + dy
-                if (
-                    not 0 <= new_x < COLUMNS
-                    or not 0 <= new_y < ROWS
-                    or (
-                        self.grid[new_y][new_x] is not None
-                        and all(v >= 0 for v in self.grid[new_y][new_x])
-                    )
-                ):
-                    break
-            else:
-                continue
-            break
-        else:
-            can_move = True
-        return can_move
+        left, right, top, bottom = SHAPE_EXTENTS[self.block_type][self.rotation]
+        new_x = self.x + dx
+        new_y = self.y + dy
+        if (
+            new_x + left < 0
+            or new_x + right >= COLUMNS
+            or new_y + top < 0
+            or new_y + bottom >= ROWS
+        ):
+            return False
+        shape = SHAPE_MASKS[self.block_type][self.rotation]
+        row_masks = self.row_masks
+        x = self.x
+        discount_self = self.placed and self.solid
+        for y in range(top, bottom + 1):
+            occupied = row_masks[new_y + y]
+            if discount_self and top <= y + dy <= bottom:
+                # Squares occupied by this shape do not block its own movement
+                occupied &= ~_shift_mask(shape[y + dy], x)
+            if _shift_mask(shape[y], new_x) & occupied:
+                return False
+        return True
+
+    def can_fall(self) -> bool:
+        # Determines whether this shape can move down,
+        # which only changes when the shape moves or rotates
+        if self._can_fall is None:
+            self._can_fall = self.can_move(dx=0, dy=1)
+        return self._can_fall
 
     @with_remove
+    def _translate(self, dx: int, dy: int):
+        self.x += dx
+        self.y += dy
+        self._can_fall = None
+
     def _move(self, dx: int = 0, dy: int = 0, test_move: bool = True) -> Optional[bool]:
         # Moves the block to the specified location
         # Returns if the operation succeeded, if test_move is True, otherwise None
-        if test_move:
-            can_move = self.can_move(dx=dx, dy=dy)
-        if not test_move or can_move:
-            self.x += dx
-            self.y += dy
+        # The shape is only lifted off the grid once the move is known to be possible
+        if test_move and not self.can_move(dx=dx, dy=dy):
+            return False
+        self._translate(dx, dy)
 
-        return can_move if test_move else None
+        return True if test_move else None
 
     @with_remove
     def _rotate(
@@ -184,27 +235,28 @@ class TetrominoBase:
         if self.block_type == BlockType.OBlock:
             return True, 0, 0, None
         amount %= 4
+        self._can_fall = None
         old_rotation = self.rotation
+        old_block = self.block
+        old_cells = self._cells
         self.rotation = (self.rotation + amount) % 4
-        for _ in range(amount):
-            self.block = [
-                "".join(self.block[y][x] for y in range(len(self.block) - 1, -1, -1))
-                for x in range(len(self.block[0]))
-            ]
+        self.block = self._shapes[self.rotation]
+        self._cells = CELL_OFFSETS[self.block_type][self.rotation]
 
         if test_rotation and not self._can_place():
             # Normal rotation cannot be performed
-            try:
-                wall_kicks = WALL_KICKS[self.block_type][old_rotation][self.rotation]
-            except KeyError:
-                pass
-            else:
-                for i, (dx, dy) in enumerate(wall_kicks):
-                    if self.can_move(dx=dx, dy=dy):
-                        self._move(dx=dx, dy=dy, test_move=False)
-                        return True, old_rotation, self.rotation, i
-
-            self._rotate(-amount)  # Undoes the rotation
+            wall_kicks = WALL_KICKS_FLAT[
+                self.block_type.value * 16 + old_rotation * 4 + self.rotation
+            ]
+            for i, (dx, dy) in enumerate(wall_kicks):
+                if self.can_move(dx=dx, dy=dy):
+                    self._move(dx=dx, dy=dy, test_move=False)
+                    return True, old_rotation, self.rotation, i
+
+            # Undoes the rotation
+            self.rotation = old_rotation
+            self.block = old_block
+            self._cells = old_cells
             return False, None, None, None
         return True, old_rotation, self.rotation, None
 
@@ -219,12 +271,18 @@ class TetrominoBase:
         """
         return self._move(dy=1, test_move=test_move)
 
+    def drop_distance(self) -> int:
+        # Determines how many rows this shape can move straight down
+        # Only the bitmasks are tested, the shape is not moved until it lands
+        distance = 0
+        while self.can_move(dx=0, dy=distance + 1):
+            distance += 1
+        return distance
+
     def hard_drop(self) -> int:
-        lines = 0
-        while True:
-            if not self._move(dy=1):
-                break
-            lines += 1
+        lines = self.drop_distance()
+        if lines:
+            self._move(dy=lines, test_move=False)
         return lines
 
 
@@ -233,6 +291,10 @@ class GhostPiece(TetrominoBase):
     Represents the Ghost Piece of a tetromino
     """
 
+    __slots__ = ()
+
+    solid = False
+
     def __init__(
         self,
         x: int,
@@ -240,25 +302,40 @@ class GhostPiece(TetrominoBase):
         block_type: BlockType,
         color: Color,
         grid: List[List[Color]],
+        row_masks: List[int],
         rotation: int = 0,
     ):
-        color = tuple(-v for v in color)
-        super().__init__(x, y, block_type, color, grid)
+        super().__init__(x, y, block_type, color, grid, row_masks)
         self._rotate(rotation, test_rotation=False)
         self.hard_drop()
 
     def place(self, *args, **kwargs):
         return super().place(test_place=False, skip_non_empty=True)
 
+    def follow(self, tetromino: TetrominoBase):
+        # Moves the ghost piece to where a tetromino would land,
+        # reusing the tetromino's rotated shape rather than rotating again
+        self.x = tetromino.x
+        self.y = tetromino.y
+        self.rotation = tetromino.rotation
+        self.block = tetromino.block
+        self._cells = tetromino._cells
+        self._can_fall = None
+        self.hard_drop()
+
 
 class Tetromino(TetrominoBase):
     """
     Represents a Tetris tetromino
     """
 
-    def __init__(self, x, y, block_type, color, grid):
-        super().__init__(x, y, block_type, color, grid)
-        self.ghost_piece = GhostPiece(x, y, block_type, color, grid)
+    __slots__ = ("ghost_piece",)
+
+    def __init__(self, x, y, block_type, color, grid, row_masks):
+        super().__init__(x, y, block_type, color, grid, row_masks)
+        self.ghost_piece = GhostPiece(
+            x, y, block_type, GHOST_COLORS[block_type], grid, row_masks
+        )
         self.ghost_piece.place()
 
     def renew_ghost_piece(method):  # noqa
@@ -266,9 +343,13 @@ class Tetromino(TetrominoBase):
             ret = method(self, *args, **kwargs)
             self.remove()
             self.ghost_piece.remove()
-            self.ghost_piece = GhostPiece(
-                self.x, self.y, self.block_type, self.color, self.grid, self.rotation
-            )
+            # Moving straight down cannot change where the tetromino would land,
+            # so the ghost piece only needs dropping again after other movements
+            if (self.x, self.rotation) != (
+                self.ghost_piece.x,
+                self.ghost_piece.rotation,
+            ):
+                self.ghost_piece.follow(self)
             self.ghost_piece.place()
             self.place()
 
@@ -325,23 +406,12 @@ class Tetromino(TetrominoBase):
         self.ghost_piece.remove()
 
 
-class MovementEntry:
-    """
-    Represents a movement made
-    """
-
-    def __init__(self, movement: Movement, **attrs):
-        self.movement = movement
-        self.__dict__.update(attrs)
-
-    def __repr__(self):
-        return "{0.__name__}({1})".format(
-            type(self),
-            ", ".join(
-                f"{k}={v!r}" if isinstance(v, str) else f"{k}={v}"
-                for k, v in self.__dict__.items()
-            ),
-        )
+# A movement made, with the rotations and wall kick used if it was a rotation
+MovementEntry = namedtuple(
+    "MovementEntry",
+    "movement old_rotation new_rotation wall_kick",
+    defaults=(None, None, None),
+)
 
 
 class TetrisState:
@@ -349,8 +419,35 @@ class TetrisState:
     Represents the state of the game
     """
 
+    __slots__ = (
+        "grid",
+        "row_masks",
+        "fall_interval",
+        "fall_timer",
+        "lock_timer",
+        "new_block_timer",
+        "lock_started",
+        "block_fall",
+        "new_block",
+        "hold_block_type",
+        "block_held",
+        "block",
+        "_move_handlers",
+        "game_over",
+        "next_tetrominoes",
+        "level",
+        "current_line_count",
+        "score",
+        "paused",
+        "dirty",
+        "move_log",
+        "line_clear_log",
+    )
+
     def __init__(self):
         self.grid = [[None for x in range(COLUMNS)] for y in range(ROWS)]
+        # Bitmasks of the squares filled by solid blocks, one for each row
+        self.row_masks = [0 for y in range(ROWS)]
         self.fall_interval = 1000
         self.fall_timer = 0
         self.lock_timer = 0
@@ -361,13 +458,16 @@ class TetrisState:
         self.hold_block_type = None
         self.block_held = False  # Indicates whether a block has been held this turn
         self.block = None
+        self._move_handlers = ()
         self.game_over = False
-        self.next_tetrominoes = []
+        self.next_tetrominoes = deque()
         self.level = 1
         self.current_line_count = 0
         self.score = 0
         self.paused = False
-        self.move_log = []
+        self.dirty = True  # Indicates whether the state has changed since last drawn
+        # Only the last two movements are needed to determine T-Spins
+        self.move_log = deque(maxlen=2)
         self.line_clear_log = []
 
     @property
@@ -381,15 +481,22 @@ class TetrisState:
         return count
 
     def _clear_lines(self) -> int:
-        count = 0
-        for y, row in enumerate(self.grid):
-            if all(square is not None for square in row):
-                self.grid = (
-                    [[None for _ in range(COLUMNS)]]
-                    + self.grid[:y]
-                    + self.grid[y + 1 :]
-                )
-                count += 1
+        # Most locks clear nothing, which a single membership test can tell
+        if FULL_ROW_MASK not in self.row_masks:
+            return 0
+        # Moves the rows that are not full down over the full ones, in place,
+        # then empties the rows left over at the top
+        write = ROWS - 1
+        for read in range(ROWS - 1, -1, -1):
+            if self.row_masks[read] != FULL_ROW_MASK:
+                if write != read:
+                    self.grid[write] = self.grid[read]
+                    self.row_masks[write] = self.row_masks[read]
+                write -= 1
+        count = write + 1
+        for y in range(count):
+            self.grid[y] = [None for _ in range(COLUMNS)]
+            self.row_masks[y] = 0
         return count
 
     def _calculate_level(self, lines: int):
@@ -399,7 +506,7 @@ class TetrisState:
         while self.current_line_count >= self.level * LINE_GOAL_MULTIPLIER:
             self.current_line_count -= self.level * LINE_GOAL_MULTIPLIER
             self.level += 1
-        self.fall_interval = 1000 * (0.8 - 0.007 * (self.level - 1)) ** (self.level - 1)
+        self.fall_interval = FALL_INTERVALS[min(self.level, len(FALL_INTERVALS)) - 1]
 
     def _previous_line_clear_difficult(self):
         for line_clear in reversed(self.line_clear_log[:-1]):
@@ -442,10 +549,16 @@ class TetrisState:
     def _hard_drop(self):
         lines = self.block.hard_drop()
         self._increase_score(hard_drop_cells=lines)
-        self.new_block = True
+        self._await_new_block()
 
         return True if lines else False
 
+    def _await_new_block(self):
+        # Starts the delay before the next block, unless it has already started
+        if not self.new_block:
+            self.new_block = True
+            self.new_block_timer = 0
+
     def _soft_drop(self):
         if self.block.move_down():
             self._increase_score(soft_drop_cells=1)
@@ -454,51 +567,49 @@ class TetrisState:
         return False
 
     def _do_move(self, movement: Movement):
-        moves = {
-            Movement.SOFT_DROP: self._soft_drop,
-            Movement.HARD_DROP: self._hard_drop,
-            Movement.GRAVITY: self.block.move_down,
-            Movement.LEFT: self.block.move_left,
-            Movement.RIGHT: self.block.move_right,
-            Movement.ROT_C: self.block.rotate_clockwise,
-            Movement.ROT_AC: self.block.rotate_anticlockwise,
-        }
-        success = moves[movement]()
-        if movement in (Movement.ROT_C, Movement.ROT_AC):
+        success = self._move_handlers[movement.value]()
+        if movement in ROTATION_MOVEMENTS:
             success, old_rotation, new_rotation, wall_kick = success
         if success:
-            log_entry = MovementEntry(movement)
-            if movement in (
-                Movement.LEFT,
-                Movement.RIGHT,
-                Movement.ROT_AC,
-                Movement.ROT_C,
-            ):
+            self.dirty = True
+            if movement in LOCK_RESET_MOVEMENTS:
                 self.lock_timer = 0
-                if movement in (Movement.ROT_AC, Movement.ROT_C):
-                    log_entry.old_rotation = old_rotation
-                    log_entry.new_rotation = new_rotation
-                    log_entry.wall_kick = wall_kick
+            if movement in ROTATION_MOVEMENTS:
+                log_entry = MovementEntry(
+                    movement, old_rotation, new_rotation, wall_kick
+                )
+            else:
+                log_entry = MovementEntry(movement)
             self.move_log.append(log_entry)
             if movement == Movement.HARD_DROP:
                 self._on_lock()
 
     @staticmethod
     def _generate_tetrominoes():  # Implements the Random Generator
-        tetrominoes = list(BlockType)
-        random.shuffle(tetrominoes)
-        return tetrominoes
+        return random.sample(BLOCK_TYPES, len(BLOCK_TYPES))
 
     def _new_block(self, block_type: Optional[BlockType] = None):
         if block_type is None:
             if len(self.next_tetrominoes) < 7:
-                self.next_tetrominoes += self._generate_tetrominoes()
-            block_type = self.next_tetrominoes.pop(0)
-        self.block = Tetromino(*SPAWN_POS, block_type, COLORS[block_type], self.grid)
+                self.next_tetrominoes.extend(self._generate_tetrominoes())
+            block_type = self.next_tetrominoes.popleft()
+        self.block = Tetromino(
+            *SPAWN_POS, block_type, COLORS[block_type], self.grid, self.row_masks
+        )
         if not self.block.place():
             self.block = None
         else:
             self.block.move_down()
+            # Methods performing each movement, indexed by the movement's value
+            self._move_handlers = (
+                self.block.move_down,
+                self._soft_drop,
+                self._hard_drop,
+                self.block.move_left,
+                self.block.move_right,
+                self.block.rotate_clockwise,
+                self.block.rotate_anticlockwise,
+            )
         self.fall_timer = 0
         self.block_fall = False
 
@@ -514,63 +625,57 @@ class TetrisState:
             self._new_block(self.hold_block_type)
             self.hold_block_type = old_block_type
         self.block_held = True
+        self.dirty = True
 
     def _determine_t_spin(self) -> Optional[bool]:
         # Returns None if no T-Spin, True for a full T-spin, False for a Mini
+        block = self.block
         if (
-            self.block.block_type == BlockType.TBlock
+            block.block_type == BlockType.TBlock
+            and self.move_log
             and self.move_log[-1].movement in ROTATION_MOVEMENTS
         ):
-            corners = []
-            for x, y in ((0, 0), (0, 2), (2, 0), (2, 2)):
-                grid_x = x + self.block.x
-                grid_y = y + self.block.y
-                if (
-                    grid_x < COLUMNS
-                    and grid_y < ROWS
-                    and self.grid[grid_y][grid_x] is not None
-                ):
-                    corners.append((x, y))
-            if len(corners) >= 3:  # 4 is possible with the TST twist
+            block_x, block_y, rotation = block.x, block.y, block.rotation
+            row_masks = self.row_masks
+            corners = 0  # Bit i is set if the i-th corner is occupied
+            for i, (x, y) in enumerate(T_BLOCK_CORNERS):
+                grid_x = x + block_x
+                grid_y = y + block_y
+                # Squares outside the playing field count as empty
+                if 0 <= grid_x < COLUMNS and grid_y < ROWS:
+                    corners |= (row_masks[grid_y] >> grid_x & 1) << i
+            corner_count = bin(corners).count("1")
+            if corner_count >= 3:  # 4 is possible with the TST twist
                 # If one of the corners next to the pointing side
                 # is not occupied, then the T-Spin is a Mini
                 full_spin = True
-                if any(
-                    pos not in corners
-                    for pos in T_BLOCK_POINTING_CORNERS[self.block.rotation]
-                ):
+                pointing_corners = T_BLOCK_POINTING_MASKS[rotation]
+                if corners & pointing_corners != pointing_corners:
                     full_spin = False
                 else:
                     # If the block behind the centerpiece of the T-Block is empty,
                     # and the two blocks either side of the empty block are filled,
                     # (forming a hole) it is also a T-Spin Mini.
-                    x, y = (
-                        x1 + x2
-                        for x1, x2 in zip(
-                            (self.block.x, self.block.y),
-                            T_BLOCK_BEHIND_BLOCK[self.block.rotation],
-                        )
-                    )
+                    behind_x, behind_y = T_BLOCK_BEHIND_BLOCK[rotation]
+                    x = block_x + behind_x
+                    y = block_y + behind_y
                     if (
                         not full_spin
-                        and len(corners) == 3
+                        and corner_count == 3
                         and self.grid[y][x] is None
-                        and all(
-                            pos in T_BLOCK_POINTING_CORNERS[self.block.rotation]
-                            for pos in corners
-                        )
+                        and not corners & ~pointing_corners
                     ):
                         full_spin = False
                 if not full_spin:
                     # T-Spin mini is upgraded to a standard T-Spin
                     # if a TST twist is executed
-                    rotation = None
-                    for i, entry in enumerate(self.move_log[-2:]):
-                        if entry.movement not in (Movement.ROT_AC, Movement.ROT_C) or (
-                            rotation is not None and entry.movement != rotation
+                    direction = None
+                    for i, entry in enumerate(self.move_log):
+                        if entry.movement not in ROTATION_MOVEMENTS or (
+                            direction is not None and entry.movement != direction
                         ):
                             break
-                        rotation = entry.movement
+                        direction = entry.movement
                         expected_transition = (
                             TST_ROTATIONS
                             if entry.movement == Movement.ROT_C
@@ -588,11 +693,8 @@ class TetrisState:
         return None
 
     def _topped_out(self):
-        for row in reversed(self.grid[:-VISIBLE_ROWS]):
-            for square in row:
-                if square is not None:
-                    return True
-        return False
+        # Whether any square above the visible rows is filled
+        return any(self.row_masks[:-VISIBLE_ROWS])
 
     def _on_lock(self):
         if self._topped_out():
@@ -617,30 +719,36 @@ class TetrisState:
             self.new_block = False
             self.block_held = False
             self.new_block_timer = 0
+            self.dirty = True
             if self.block is None:
                 self.game_over = True
                 return
 
-        if self.new_block:
-            self.new_block_timer += millis
+        # Timers always run, and are reset when the delay they measure starts
+        self.new_block_timer += millis
+        self.lock_timer += millis
         if self.block:
             if not self.block_fall:
                 self.fall_timer += millis
-            if self.lock_started:
-                self.lock_timer += millis
             if self.fall_timer >= self.fall_interval:
                 self.block_fall = True
                 self.fall_timer %= self.fall_interval
-            if self.block.can_move(dx=0, dy=1):
+            if self.block.can_fall():
                 self.lock_started = False
                 self.lock_timer = 0
                 if self.block_fall:
                     self.block.move_down(test_move=False)
+                    self.dirty = True
                 self.block_fall = False
-            else:
+            elif not self.lock_started:
+                # The lock delay is counted from the frame after the block lands
                 self.lock_started = True
+                self.lock_timer = 0
             if self.lock_timer >= LOCK_DELAY:
                 moved = self.block.move_down()
-                self.new_block = not moved
-                if not moved:
+                self.dirty = True
+                if moved:
+                    self.new_block = False
+                else:
+                    self._await_new_block()
                     self._on_lock()